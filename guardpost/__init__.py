@@ -1,22 +1,62 @@
-from .authentication import (
-    AuthenticationHandler,
-    AuthenticationHandlerConfType,
-    AuthenticationSchemesNotFound,
-    AuthenticationStrategy,
-    Identity,
-    User,
-)
-from .authorization import (
-    AuthorizationConfigurationError,
-    AuthorizationContext,
-    AuthorizationError,
-    AuthorizationStrategy,
-    Policy,
-    PolicyNotFoundError,
-    Requirement,
-    RequirementConfType,
-    UnauthorizedError,
-)
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .authentication import (
+        AuthenticationHandler,
+        AuthenticationHandlerConfType,
+        AuthenticationSchemesNotFound,
+        AuthenticationStrategy,
+        Identity,
+        User,
+    )
+    from .authorization import (
+        AuthorizationConfigurationError,
+        AuthorizationContext,
+        AuthorizationError,
+        AuthorizationStrategy,
+        Policy,
+        PolicyNotFoundError,
+        Requirement,
+        RequirementConfType,
+        UnauthorizedError,
+    )
+
+# Names are imported lazily from their modules when they are first accessed, so
+# that importing a submodule (e.g. guardpost.jwts) does not load the whole package
+_EXPORTS = {
+    "AuthenticationHandler": ".authentication",
+    "AuthenticationHandlerConfType": ".authentication",
+    "AuthenticationSchemesNotFound": ".authentication",
+    "AuthenticationStrategy": ".authentication",
+    "Identity": ".authentication",
+    "User": ".authentication",
+    "AuthorizationConfigurationError": ".authorization",
+    "AuthorizationContext": ".authorization",
+    "AuthorizationError": ".authorization",
+    "AuthorizationStrategy": ".authorization",
+    "Policy": ".authorization",
+    "PolicyNotFoundError": ".authorization",
+    "Requirement": ".authorization",
+    "RequirementConfType": ".authorization",
+    "UnauthorizedError": ".authorization",
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 __all__ = [
     "AuthenticationHandlerConfType",
@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import Any, Iterable, List, Optional, Type, TypeVar, Union
+from typing import Any, Iterable, Optional, Type, TypeVar, Union
 
 from rodi import ContainerProtocol
 
@@ -39,7 +39,9 @@ class BaseStrategy(ABC):
         except AttributeError:
             return None
 
-    def _get_instances(self, items: List[Union[T, Type[T]]], scope: Any) -> Iterable[T]:
+    def _get_instances(
+        self, items: Iterable[Union[T, Type[T]]], scope: Any
+    ) -> Iterable[T]:
         """
         Yields instances of types, optionally activated through dependency injection.
 
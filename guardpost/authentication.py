@@ -1,12 +1,27 @@
 import inspect
 from abc import ABC, abstractmethod
-from functools import lru_cache
-from typing import Any, List, Optional, Sequence, Type, Union
+from itertools import chain
+from types import MappingProxyType
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    Union,
+)
 
 from rodi import ContainerProtocol
 
 from guardpost.abc import BaseStrategy
 
+# Claims of identities created without claims: shared, hence read-only
+_EMPTY_CLAIMS: Mapping[str, Any] = MappingProxyType({})
+
 
 class Identity:
     """
@@ -14,22 +29,39 @@ class Identity:
     application. It can be a user interacting with an app, or a technical account.
     """
 
+    __slots__ = (
+        "claims",
+        "_authentication_mode",
+        "_authenticated",
+        "access_token",
+        "refresh_token",
+    )
+
     def __init__(
         self,
         claims: Optional[dict] = None,
         authentication_mode: Optional[str] = None,
     ):
-        self.claims = claims or {}
+        self.claims = _EMPTY_CLAIMS if claims is None else claims
         self.authentication_mode = authentication_mode
         self.access_token: Optional[str] = None
         self.refresh_token: Optional[str] = None
 
+    @property
+    def authentication_mode(self) -> Optional[str]:
+        return self._authentication_mode
+
+    @authentication_mode.setter
+    def authentication_mode(self, value: Optional[str]) -> None:
+        self._authentication_mode = value
+        self._authenticated = bool(value)
+
     @property
     def sub(self) -> Optional[str]:
-        return self.get("sub")
+        return self.claims.get("sub")
 
     def is_authenticated(self) -> bool:
-        return bool(self.authentication_mode)
+        return self._authenticated
 
     def get(self, key: str):
         return self.claims.get(key)
@@ -45,37 +77,46 @@ class Identity:
 
 
 class User(Identity):
+    __slots__ = ()
+
     @property
     def id(self) -> Optional[str]:
-        return self.get("id") or self.sub
+        return self.claims.get("id") or self.claims.get("sub")
 
     @property
     def name(self) -> Optional[str]:
-        return self.get("name")
+        return self.claims.get("name")
 
     @property
     def email(self) -> Optional[str]:
-        return self.get("email")
+        return self.claims.get("email")
 
 
 class AuthenticationHandler(ABC):
     """Base class for types that implement authentication logic."""
 
+    _is_async = False
+    _default_scheme = "AuthenticationHandler"
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # determine once per type whether authenticate is a coroutine function, so
+        # that synchronous handlers are called without awaiting
+        cls._is_async = inspect.iscoroutinefunction(cls.authenticate)
+        cls._default_scheme = cls.__name__
+
     @property
     def scheme(self) -> str:
         """Returns the name of the Authentication Scheme used by this handler."""
-        return self.__class__.__name__
+        return self._default_scheme
 
     @abstractmethod
     def authenticate(self, context: Any) -> Optional[Identity]:
         """Obtains an identity from a context."""
 
 
-@lru_cache(maxsize=None)
-def _is_async_handler(handler_type: Type[AuthenticationHandler]) -> bool:
-    # Faster alternative to using inspect.iscoroutinefunction without caching
-    # Note: this must be used on Types - not instances!
-    return inspect.iscoroutinefunction(handler_type.authenticate)
+def _is_async_handler(handler: Any) -> bool:
+    return inspect.iscoroutinefunction(handler.authenticate)
 
 
 AuthenticationHandlerConfType = Union[
@@ -85,12 +126,19 @@ AuthenticationHandlerConfType = Union[
 
 class AuthenticationSchemesNotFound(ValueError):
     def __init__(
-        self, configured_schemes: Sequence[str], required_schemes: Sequence[str]
+        self, configured_schemes: Iterable[str], required_schemes: Iterable[str]
     ):
-        super().__init__(
+        super().__init__()
+        self.configured_schemes = tuple(configured_schemes)
+        self.required_schemes = tuple(required_schemes)
+
+    def __str__(self) -> str:
+        # the message is built only when needed, since this error can be handled
+        # without ever being displayed
+        return (
             "Could not find authentication handlers for required schemes: "
-            f'{", ".join(required_schemes)}. '
-            f'Configured schemes are: {", ".join(configured_schemes)}'
+            f'{", ".join(self.required_schemes)}. '
+            f'Configured schemes are: {", ".join(self.configured_schemes)}'
         )
 
 
@@ -101,7 +149,13 @@ class AuthenticationStrategy(BaseStrategy):
         container: Optional[ContainerProtocol] = None,
     ):
         super().__init__(container)
-        self.handlers = list(handlers)
+        self.handlers: List[AuthenticationHandlerConfType] = list(handlers)
+        # copy of the handlers indexed below: the index is rebuilt when the handlers
+        # list no longer matches it, e.g. because it was modified directly
+        self._indexed_handlers: List[AuthenticationHandlerConfType] = []
+        self._handlers_by_scheme: Dict[str, List[AuthenticationHandlerConfType]] = {}
+        self._indexes_types = False
+        self._requires_activation = False
 
     def add(self, handler: AuthenticationHandlerConfType) -> "AuthenticationStrategy":
         self.handlers.append(handler)
@@ -113,19 +167,87 @@ class AuthenticationStrategy(BaseStrategy):
         self.handlers.append(handler)
         return self
 
+    def _index_handlers(self) -> None:
+        """
+        Indexes the configured handlers by authentication scheme.
+        """
+        handlers = list(self.handlers)
+        handlers_by_scheme: Dict[str, List[AuthenticationHandlerConfType]] = {}
+        indexes_types = False
+        requires_activation = False
+
+        for handler in handlers:
+            if not isinstance(handler, type):
+                scheme = handler.scheme
+            elif handler.scheme is AuthenticationHandler.scheme:
+                # a handler type that does not override scheme uses its default one,
+                # so it can be indexed without being activated
+                scheme = handler._default_scheme
+                indexes_types = True
+            else:
+                # the scheme of a handler type that overrides it is known only once
+                # the handler is resolved, so it cannot be indexed in advance
+                requires_activation = True
+                continue
+            handlers_by_scheme.setdefault(scheme, []).append(handler)
+
+        self._indexed_handlers = handlers
+        self._handlers_by_scheme = handlers_by_scheme
+        self._indexes_types = indexes_types
+        self._requires_activation = requires_activation
+
     def _get_handlers_by_schemes(
         self,
-        authentication_schemes: Optional[Sequence[str]] = None,
+        authentication_schemes: Optional[Collection[str]] = None,
         context: Any = None,
     ) -> List[AuthenticationHandler]:
         if not authentication_schemes:
             return list(self._get_instances(self.handlers, context))
 
-        handlers = [
-            handler
-            for handler in self._get_instances(self.handlers, context)
-            if handler.scheme in authentication_schemes
-        ]
+        if self._indexed_handlers != self.handlers:
+            self._index_handlers()
+
+        handlers: List[AuthenticationHandler] = []
+
+        if not self._requires_activation:
+            handlers_by_scheme = self._handlers_by_scheme
+            matches = [
+                handlers_by_scheme[scheme]
+                for scheme in authentication_schemes
+                if scheme in handlers_by_scheme
+            ]
+            if len(matches) == 1:
+                selected = matches[0]
+            else:
+                # handlers are kept in the order in which they were registered, and
+                # each one is used once, even if its scheme is repeated
+                ids = {id(handler) for handler in chain.from_iterable(matches)}
+                selected = [item for item in self.handlers if id(item) in ids]
+
+            # only the handlers of the requested schemes are activated, if needed
+            handlers = list(self._get_instances(selected, context))
+
+            if self._indexes_types:
+                # a DI container can resolve a handler type to a handler having
+                # another scheme, e.g. a subclass
+                handlers = [
+                    handler
+                    for handler in handlers
+                    if handler.scheme in authentication_schemes
+                ]
+
+        if not handlers and (self._requires_activation or self._indexes_types):
+            # handler types are resolved to read their actual scheme
+            schemes: FrozenSet[str] = (
+                authentication_schemes
+                if isinstance(authentication_schemes, frozenset)
+                else frozenset(authentication_schemes)
+            )
+            handlers = [
+                handler
+                for handler in self._get_instances(self.handlers, context)
+                if handler.scheme in schemes
+            ]
 
         if not handlers:
             raise AuthenticationSchemesNotFound(
@@ -139,16 +261,40 @@ class AuthenticationStrategy(BaseStrategy):
         return handlers
 
     async def authenticate(
-        self, context: Any, authentication_schemes: Optional[Sequence[str]] = None
+        self, context: Any, authentication_schemes: Optional[Collection[str]] = None
     ) -> Optional[Identity]:
         """
         Tries to obtain the user for a context, applying authentication rules.
+
+        Handlers are tried in the order in which they were registered. Authentication
+        schemes can be given as a frozenset, reused across calls, to avoid converting
+        them on each call.
         """
         if not context:
             raise ValueError("Missing context to evaluate authentication")
 
-        for handler in self._get_handlers_by_schemes(authentication_schemes, context):
-            if _is_async_handler(type(handler)):
+        handlers: Iterable[AuthenticationHandler]
+        if authentication_schemes:
+            handlers = self._get_handlers_by_schemes(authentication_schemes, context)
+        else:
+            # handlers are activated lazily, so the ones following the handler that
+            # authenticates the context are not resolved at all
+            handlers = self._get_instances(self.handlers, context)
+
+        for handler in handlers:
+            try:
+                # the flag of the handler type is used, unless authenticate was
+                # replaced on the instance (e.g. by a mock)
+                is_async = (
+                    handler._is_async
+                    if "authenticate" not in handler.__dict__
+                    else _is_async_handler(handler)
+                )
+            except AttributeError:
+                # handlers that do not derive from AuthenticationHandler
+                is_async = _is_async_handler(handler)
+
+            if is_async:
                 identity = await handler.authenticate(context)  # type: ignore
             else:
                 identity = handler.authenticate(context)
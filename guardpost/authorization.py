@@ -1,7 +1,19 @@
 import inspect
 from abc import ABC, abstractmethod
 from functools import lru_cache, wraps
-from typing import Any, Callable, Iterable, List, Optional, Sequence, Set, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 from rodi import ContainerProtocol
 
@@ -43,6 +55,14 @@ def _is_async_handler(handler_type: Type[Requirement]) -> bool:
     return inspect.iscoroutinefunction(handler_type.handle)
 
 
+def _get_async_flag(requirement: RequirementConfType) -> Optional[bool]:
+    if isinstance(requirement, type):
+        # a type is classified only once resolved, since a DI container can resolve
+        # it to a subclass that handles the requirement differently
+        return None
+    return _is_async_handler(type(requirement))
+
+
 class UnauthorizedError(AuthorizationError):
     """
     Error class used for all situations in which a user initiating an operation is not
@@ -99,23 +119,29 @@ class ForbiddenError(UnauthorizedError):
 
 
 class AuthorizationContext:
-    __slots__ = ("identity", "requirements", "_succeeded", "_failed_forced")
+    __slots__ = ("identity", "requirements", "_pending", "_failed_forced")
 
     def __init__(self, identity: Identity, requirements: Sequence[Requirement]):
         self.identity = identity
-        self.requirements = requirements
-        self._succeeded: Set[Requirement] = set()
+        self.requirements: Tuple[Requirement, ...] = tuple(requirements)
+        self._pending: Set[Requirement] = set(self.requirements)
         self._failed_forced: Optional[str] = None
 
     @property
     def pending_requirements(self) -> List[Requirement]:
-        return [item for item in self.requirements if item not in self._succeeded]
+        pending = self._pending
+        if not pending:
+            return []
+        if len(pending) == len(self.requirements):
+            # no requirement succeeded
+            return list(self.requirements)
+        return [item for item in self.requirements if item in pending]
 
     @property
     def has_succeeded(self) -> bool:
         if self._failed_forced:
             return False
-        return all(requirement in self._succeeded for requirement in self.requirements)
+        return not self._pending
 
     @property
     def forced_failure(self) -> Optional[str]:
@@ -136,11 +162,11 @@ class AuthorizationContext:
 
     def succeed(self, requirement: Requirement):
         """Marks the given requirement as succeeded for this authorization context."""
-        self._succeeded.add(requirement)
+        self._pending.discard(requirement)
 
     def clear(self):
         self._failed_forced = None
-        self._succeeded.clear()
+        self._pending = set(self.requirements)
 
 
 class Policy:
@@ -148,11 +174,36 @@ class Policy:
     Represents an authorization policy, with a set of authorization rules.
     """
 
-    __slots__ = ("name", "requirements")
+    __slots__ = (
+        "name",
+        "_requirements",
+        "_requirements_set",
+        "_async_flags",
+        "_sync",
+    )
 
     def __init__(self, name: str, *requirements: RequirementConfType):
         self.name = name
-        self.requirements = list(requirements) or []
+        self.requirements = requirements
+
+    @property
+    def requirements(self) -> Tuple[RequirementConfType, ...]:
+        return self._requirements
+
+    @requirements.setter
+    def requirements(self, value: Iterable[RequirementConfType]) -> None:
+        # a requirement included more than once would be handled more than once
+        self._requirements: Tuple[RequirementConfType, ...] = tuple(
+            dict.fromkeys(value)
+        )
+        self._requirements_set: Set[RequirementConfType] = set(self._requirements)
+        # whether each requirement instance is handled asynchronously, determined
+        # once here rather than on each authorization (None for requirement types)
+        self._async_flags: Tuple[Optional[bool], ...] = tuple(
+            _get_async_flag(item) for item in self._requirements
+        )
+        # whether all requirements are instances handled synchronously
+        self._sync = all(flag is False for flag in self._async_flags)
 
     def _valid_requirement(self, obj):
         if not isinstance(obj, Requirement) or (
@@ -164,13 +215,15 @@ class Policy:
 
     def add(self, requirement: RequirementConfType) -> "Policy":
         self._valid_requirement(requirement)
-        self.requirements.append(requirement)
+
+        if requirement in self._requirements_set:
+            return self
+
+        self.requirements = self._requirements + (requirement,)
         return self
 
     def __iadd__(self, other: RequirementConfType):
-        self._valid_requirement(other)
-        self.requirements.append(other)
-        return self
+        return self.add(other)
 
     def __repr__(self):
         return f'<Policy "{self.name}" at {id(self)}>'
@@ -188,73 +241,138 @@ class AuthorizationStrategy(BaseStrategy):
         self.policies = list(policies)
         self.default_policy = default_policy
         self.identity_getter = identity_getter
+        self._policies_by_name: Dict[str, Policy] = {}
 
-    def get_policy(self, name: str) -> Optional[Policy]:
         for policy in self.policies:
-            if policy.name == name:
-                return policy
-        return None
+            self._policies_by_name.setdefault(policy.name, policy)
+
+    def get_policy(self, name: str) -> Optional[Policy]:
+        policy = self._policies_by_name.get(name)
+
+        if policy is None:
+            # policies appended to the policies list directly are not indexed yet
+            policy = next((item for item in self.policies if item.name == name), None)
+            if policy is not None:
+                self._policies_by_name[name] = policy
+        return policy
 
     def add(self, policy: Policy) -> "AuthorizationStrategy":
         self.policies.append(policy)
+        self._policies_by_name.setdefault(policy.name, policy)
         return self
 
     def __iadd__(self, policy: Policy) -> "AuthorizationStrategy":
-        self.policies.append(policy)
-        return self
+        return self.add(policy)
 
     def with_default_policy(self, policy: Policy) -> "AuthorizationStrategy":
         self.default_policy = policy
         return self
 
-    async def authorize(
-        self, policy_name: Optional[str], identity: Identity, scope: Any = None
-    ):
+    def _get_policy_to_apply(self, policy_name: Optional[str]) -> Optional[Policy]:
         if policy_name:
             policy = self.get_policy(policy_name)
 
             if not policy:
                 raise PolicyNotFoundError(policy_name)
+            return policy
+        return self.default_policy
 
-            await self._handle_with_policy(policy, identity, scope)
+    async def authorize(
+        self, policy_name: Optional[str], identity: Identity, scope: Any = None
+    ):
+        policy = self._get_policy_to_apply(policy_name)
+
+        if policy is None:
+            self._handle_without_policy(identity)
+        elif policy._sync:
+            # applied without creating and awaiting another coroutine
+            self._handle_with_sync_policy(policy, identity, scope)
         else:
-            if self.default_policy:
-                await self._handle_with_policy(self.default_policy, identity, scope)
-                return
+            await self._handle_with_policy(policy, identity, scope)
+
+    def authorize_sync(
+        self, policy_name: Optional[str], identity: Identity, scope: Any = None
+    ):
+        """
+        Applies authorization rules synchronously. This method can only be used with
+        policies whose requirements are all handled synchronously, and raises
+        AuthorizationConfigurationError otherwise.
+        """
+        policy = self._get_policy_to_apply(policy_name)
 
-            if not identity:
-                raise UnauthorizedError("Missing identity", [])
-            if not identity.is_authenticated():
-                raise UnauthorizedError("The resource requires authentication", [])
+        if policy is None:
+            self._handle_without_policy(identity)
+        elif True in policy._async_flags:
+            # fails before activating any requirement type
+            raise self._get_async_policy_error(policy)
+        else:
+            self._handle_with_sync_policy(policy, identity, scope)
+
+    def _get_async_policy_error(
+        self, policy: Policy
+    ) -> AuthorizationConfigurationError:
+        return AuthorizationConfigurationError(
+            f"The policy {policy.name} has asynchronous requirements and cannot "
+            "be applied synchronously."
+        )
+
+    def _handle_without_policy(self, identity: Identity):
+        if not identity:
+            raise UnauthorizedError("Missing identity", [])
+        if not identity.is_authenticated():
+            raise UnauthorizedError("The resource requires authentication", [])
 
     def _get_requirements(self, policy: Policy, scope: Any) -> Iterable[Requirement]:
         yield from self._get_instances(policy.requirements, scope)
 
-    async def _handle_with_policy(self, policy: Policy, identity: Identity, scope: Any):
+    def _check_context(self, context: AuthorizationContext, identity: Identity):
+        if not context.has_succeeded:
+            if identity and identity.is_authenticated():
+                raise ForbiddenError(
+                    context.forced_failure, context.pending_requirements
+                )
+            raise UnauthorizedError(
+                context.forced_failure, context.pending_requirements
+            )
+
+    def _handle_with_sync_policy(self, policy: Policy, identity: Identity, scope: Any):
         with AuthorizationContext(
-            identity, list(self._get_requirements(policy, scope))
+            identity, tuple(self._get_requirements(policy, scope))
         ) as context:
+            if not policy._sync and any(
+                _is_async_handler(type(requirement))  # type: ignore
+                for requirement in context.requirements
+            ):
+                # a requirement type was resolved to an asynchronous requirement
+                raise self._get_async_policy_error(policy)
+
             for requirement in context.requirements:
-                if _is_async_handler(type(requirement)):  # type: ignore
+                requirement.handle(context)  # type: ignore
+
+            self._check_context(context, identity)
+
+    async def _handle_with_policy(self, policy: Policy, identity: Identity, scope: Any):
+        with AuthorizationContext(
+            identity, tuple(self._get_requirements(policy, scope))
+        ) as context:
+            requirements = context.requirements
+            flags = policy._async_flags
+            if len(flags) != len(requirements):
+                # requirements were not obtained one for each requirement of the policy
+                flags = (None,) * len(requirements)
+
+            for requirement, is_async in zip(requirements, flags):
+                if is_async is None:
+                    # requirement types are classified by the type of the instance
+                    # they were resolved to
+                    is_async = _is_async_handler(type(requirement))  # type: ignore
+
+                if is_async:
                     await requirement.handle(context)
                 else:
                     requirement.handle(context)  # type: ignore
 
-            if not context.has_succeeded:
-                if identity and identity.is_authenticated():
-                    raise ForbiddenError(
-                        context.forced_failure, context.pending_requirements
-                    )
-                raise UnauthorizedError(
-                    context.forced_failure, context.pending_requirements
-                )
-
-    async def _handle_with_identity_getter(
-        self, policy_name: Optional[str], *args, **kwargs
-    ):
-        if self.identity_getter is None:
-            raise TypeError("Missing identity getter function.")
-        await self.authorize(policy_name, self.identity_getter(*args, **kwargs))
+            self._check_context(context, identity)
 
     def __call__(self, policy: Optional[str] = None):
         """
@@ -264,7 +382,11 @@ class AuthorizationStrategy(BaseStrategy):
         def decorator(fn):
             @wraps(fn)
             async def wrapper(*args, **kwargs):
-                await self._handle_with_identity_getter(policy, *args, **kwargs)
+                identity_getter = self.identity_getter
+                if identity_getter is None:
+                    raise TypeError("Missing identity getter function.")
+
+                await self.authorize(policy, identity_getter(*args, **kwargs))
                 return await fn(*args, **kwargs)
 
             return wrapper
@@ -1,6 +1,6 @@
 from collections.abc import Mapping
 from typing import Mapping as MappingType
-from typing import Sequence, Union
+from typing import Optional, Sequence, Tuple, Union
 
 from .authorization import AuthorizationContext, Policy, Requirement
 
@@ -15,11 +15,15 @@ class AnonymousRequirement(Requirement):
             context.succeed(self)
 
 
+# Stateless, hence shared by all anonymous policies
+_ANONYMOUS_REQUIREMENT = AnonymousRequirement()
+
+
 class AnonymousPolicy(Policy):
     """Policy that requires an anonymous user, or service."""
 
     def __init__(self, name: str = "anonymous"):
-        super().__init__(name, AnonymousRequirement())
+        super().__init__(name, _ANONYMOUS_REQUIREMENT)
 
 
 class AuthenticatedRequirement(Requirement):
@@ -41,13 +45,31 @@ RequiredClaimsType = Union[MappingType[str, str], Sequence[str], str]
 class ClaimsRequirement(Requirement):
     """Requires an identity with a claims: one or more, optionally with exact values."""
 
-    __slots__ = ("required_claims",)
+    __slots__ = ("_required_claims", "_required_items", "_required_names")
 
     def __init__(self, required_claims: RequiredClaimsType):
-        if isinstance(required_claims, str):
-            required_claims = [required_claims]
         self.required_claims = required_claims
 
+    @property
+    def required_claims(self) -> RequiredClaimsType:
+        return self._required_claims
+
+    @required_claims.setter
+    def required_claims(self, value: RequiredClaimsType) -> None:
+        if isinstance(value, str):
+            value = [value]
+        self._required_claims = value
+
+        # the kind of required claims is determined once here, rather than on each
+        # authorization
+        self._required_items: Optional[Tuple[Tuple[str, str], ...]] = None
+        self._required_names: Tuple[str, ...] = ()
+
+        if isinstance(value, Mapping):
+            self._required_items = tuple(value.items())
+        else:
+            self._required_names = tuple(value)
+
     def handle(self, context: AuthorizationContext):
         identity = context.identity
 
@@ -55,12 +77,15 @@ class ClaimsRequirement(Requirement):
             context.fail("Missing identity")
             return
 
-        if isinstance(self.required_claims, Mapping):
-            if all(
-                identity.has_claim_value(key, value)
-                for key, value in self.required_claims.items()
-            ):
+        # claims are checked through the identity, whose methods can be overridden,
+        # binding the method once rather than for each required claim
+        required_items = self._required_items
+
+        if required_items is not None:
+            has_claim_value = identity.has_claim_value
+            if all(has_claim_value(key, value) for key, value in required_items):
                 context.succeed(self)
         else:
-            if all(identity.has_claim(name) for name in self.required_claims):
+            has_claim = identity.has_claim
+            if all(has_claim(name) for name in self._required_names):
                 context.succeed(self)
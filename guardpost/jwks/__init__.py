@@ -1,8 +1,9 @@
 import base64
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
@@ -28,11 +29,23 @@ class KeyType(Enum):
         if not value:
             raise ValueError("Missing key type (kty)")
         try:
-            return cls[value.upper()]
+            return _KEY_TYPES[value]
+        except KeyError:
+            pass
+        try:
+            return _KEY_TYPES[value.upper()]
         except KeyError:
             raise ValueError(f"Invalid JWT kty parameter: {value}")
 
 
+# Key types by name and by value, to look up the kty of JWKs without normalizing
+# their case, which is needed only for unusual casings
+_KEY_TYPES = {
+    **{key_type.name: key_type for key_type in KeyType},
+    **{key_type.value: key_type for key_type in KeyType},
+}
+
+
 @dataclass
 class JWK:
     """
@@ -48,6 +61,18 @@ class JWK:
     e: str
     pem: bytes
     kid: Optional[str] = None
+    _public_key: Any = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def public_key(self) -> Any:
+        """
+        Returns the public key object of this JWK, loaded from its PEM once.
+        """
+        if self._public_key is None:
+            self._public_key = serialization.load_pem_public_key(
+                self.pem, default_backend()
+            )
+        return self._public_key
 
     @classmethod
     def from_dict(cls, value) -> "JWK":
@@ -122,6 +147,8 @@ def _decode_value(val):
     return int.from_bytes(decoded, "big")
 
 
+# JWKS are parsed again each time they are fetched, mostly containing the same keys
+@lru_cache(maxsize=256)
 def rsa_pem_from_n_and_e(n: str, e: str) -> bytes:
     return (
         RSAPublicNumbers(n=_decode_value(n), e=_decode_value(e))
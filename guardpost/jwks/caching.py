@@ -1,5 +1,7 @@
+import asyncio
+import math
 import time
-from typing import Optional
+from typing import Dict, Optional
 
 from . import JWK, JWKS, KeysProvider
 
@@ -15,7 +17,10 @@ class CachingKeysProvider(KeysProvider):
         """
         Creates a new instance of CachingKeysProvider bound to a given KeysProvider,
         and caching its result up to an optional amount of seconds described by
-        cache_time. Expiration is disabled if `cache_time` <= 0.
+        cache_time. Expiration is disabled if `cache_time` <= 0. Keys are fetched
+        again in background when they are requested during the last tenth of
+        `cache_time`, so that requests do not wait for the source. A failed fetch
+        in background is retried after `refresh_time` seconds.
         JWKS are refreshed anyway if an unknown `kid` is encountered and the set was
         fetched more than `refresh_time` seconds ago.
         """
@@ -25,36 +30,97 @@ class CachingKeysProvider(KeysProvider):
             raise TypeError("Missing KeysProvider")
 
         self._keys: Optional[JWKS] = None
+        self._keys_by_kid: Dict[str, JWK] = {}
         self._cache_time = cache_time
         self._refresh_time = refresh_time
-        self._last_fetch_time: float = 0
+        # monotonic deadlines computed when keys are fetched, so that each call only
+        # compares them with the current time
+        self._expires_at: float = 0
+        self._refresh_ahead_at: float = 0
+        self._refreshable_at: float = 0
         self._keys_provider = keys_provider
+        self._fetching: Optional["asyncio.Future[JWKS]"] = None
 
     @property
     def keys_provider(self) -> KeysProvider:
         return self._keys_provider
 
+    def _index_keys(self, keys: JWKS) -> None:
+        # keys are indexed in reverse order, so the first key having a kid wins
+        self._keys_by_kid = {
+            jwk.kid: jwk for jwk in reversed(keys.keys) if jwk.kid is not None
+        }
+
+    def _start_fetch(self) -> "asyncio.Future[JWKS]":
+        # concurrent calls share the same fetch, so that a single request is sent to
+        # the source when keys expire under load
+        fetching = self._fetching
+
+        if fetching is None:
+            fetching = self._fetching = asyncio.ensure_future(self._get_source_keys())
+            fetching.add_done_callback(self._on_fetched)
+        return fetching
+
     async def _fetch_keys(self) -> JWKS:
+        # shielded, so that a cancelled caller does not cancel the fetch for others
+        return await asyncio.shield(self._start_fetch())
+
+    def _on_fetched(self, fetching: "asyncio.Future[JWKS]") -> None:
+        self._fetching = None
+
+        # errors reach the callers awaiting the fetch, if any
+        if not fetching.cancelled() and fetching.exception() is not None:
+            # keys still valid are fetched again in background only after
+            # refresh_time seconds, so that requests do not flood a failing source
+            retry_at = (
+                time.monotonic() + self._refresh_time
+                if self._refresh_time > 0
+                else math.inf
+            )
+            self._refresh_ahead_at = min(retry_at, self._expires_at)
+
+    async def _get_source_keys(self) -> JWKS:
         self._keys = await self._keys_provider.get_keys()
-        self._last_fetch_time = time.time()
+        now = time.monotonic()
+        if self._cache_time > 0:
+            self._expires_at = now + self._cache_time
+            self._refresh_ahead_at = now + self._cache_time * 0.9
+        else:
+            self._expires_at = self._refresh_ahead_at = math.inf
+        self._refreshable_at = now + self._refresh_time
+        self._index_keys(self._keys)
         return self._keys
 
     async def _refresh_keys(self) -> JWKS:
+        previous_set = self._keys
         new_set = await self._fetch_keys()
-        if self._keys is None:  # pragma: no cover
-            self._keys = new_set
-        else:
-            self._keys.update(new_set)
-        return self._keys
+
+        if previous_set is None or previous_set is new_set:
+            return new_set
+
+        # keys known before the refresh are kept, merging them into a new JWKS that
+        # replaces the current one, rather than updating a JWKS in use
+        merged_set = JWKS(list(previous_set.keys))
+        merged_set.update(new_set)
+        self._keys = merged_set
+        self._index_keys(merged_set)
+        return merged_set
 
     async def get_keys(self) -> JWKS:
-        if self._keys is not None:
-            if self._cache_time > 0 and (
-                time.time() - self._last_fetch_time >= self._cache_time
-            ):
-                pass
-            else:
-                return self._keys
+        keys = self._keys
+
+        if keys is not None:
+            now = time.monotonic()
+
+            if now < self._refresh_ahead_at:
+                return keys
+
+            if now < self._expires_at:
+                # keys are about to expire: they are fetched again in background, so
+                # that requests do not wait for the source
+                self._start_fetch()
+                return keys
+
         return await self._fetch_keys()
 
     async def get_key(self, kid: str) -> Optional[JWK]:
@@ -63,20 +129,14 @@ class CachingKeysProvider(KeysProvider):
         were fetched is older than `refresh_time` (default 120 seconds), it fetches
         again the JWKS from the source.
         """
-        jwks = await self.get_keys()
-
-        for jwk in jwks.keys.copy():
-            if jwk.kid is not None and jwk.kid == kid:
-                return jwk
+        await self.get_keys()
 
-        if (
-            self._refresh_time > 0
-            and time.time() - self._last_fetch_time >= self._refresh_time
-        ):
-            jwks = await self._refresh_keys()
+        jwk = self._keys_by_kid.get(kid)
+        if jwk is not None:
+            return jwk
 
-            for jwk in jwks.keys.copy():
-                if jwk.kid is not None and jwk.kid == kid:
-                    return jwk
+        if self._refresh_time > 0 and time.monotonic() >= self._refreshable_at:
+            await self._refresh_keys()
+            return self._keys_by_kid.get(kid)
 
         return None
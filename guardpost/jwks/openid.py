@@ -1,3 +1,6 @@
+import time
+from typing import Optional
+
 from guardpost.utils import get_running_loop, read_json_data
 
 from . import JWKS, KeysProvider
@@ -7,13 +10,17 @@ def _read_openid_configuration(authority: str):
     return read_json_data(authority.rstrip("/") + "/.well-known/openid-configuration")
 
 
-def read_jwks_from_authority(authority: str) -> JWKS:
+def _read_jwks_uri(authority: str) -> str:
     openid_config = _read_openid_configuration(authority)
 
     if "jwks_uri" not in openid_config:  # pragma: no cover
         raise ValueError("Expected a `jwks_uri` property in the OpenID Configuration")
 
-    jwks = read_json_data(openid_config["jwks_uri"])
+    return openid_config["jwks_uri"]
+
+
+def read_jwks_from_authority(authority: str) -> JWKS:
+    jwks = read_json_data(_read_jwks_uri(authority))
     return JWKS.from_dict(jwks)
 
 
@@ -28,18 +35,40 @@ class AuthorityKeysProvider(KeysProvider):
     discovery endpoint to obtain the `jwks_uri` and the JWKS.
     """
 
-    def __init__(self, authority: str) -> None:
+    def __init__(self, authority: str, discovery_cache_time: float = 86400) -> None:
         """
         Creates an instance of AuthorityKeysProvider bound to the given authority.
+        The `jwks_uri` obtained from the discovery endpoint is reused for the given
+        amount of seconds (by default 24 hours), so that fetching keys again
+        requests only the JWKS.
         """
         super().__init__()
         if not authority:
             raise TypeError("Missing authority")
         self._authority = authority
+        self._discovery_cache_time = discovery_cache_time
+        self._jwks_uri: Optional[str] = None
+        self._jwks_uri_expires_at: float = 0
 
     @property
     def authority(self) -> str:
         return self._authority
 
+    def _read_jwks(self) -> JWKS:
+        jwks_uri = self._jwks_uri
+
+        if jwks_uri is None or time.monotonic() >= self._jwks_uri_expires_at:
+            jwks_uri = self._jwks_uri = _read_jwks_uri(self._authority)
+            self._jwks_uri_expires_at = time.monotonic() + self._discovery_cache_time
+
+        try:
+            jwks = read_json_data(jwks_uri)
+        except Exception:
+            # the jwks_uri might have changed: discover it again on the next call
+            self._jwks_uri = None
+            raise
+        return JWKS.from_dict(jwks)
+
     async def get_keys(self) -> JWKS:
-        return await read_jwks_from_authority_async(self._authority)
+        loop = get_running_loop()
+        return await loop.run_in_executor(None, self._read_jwks)
@@ -1,7 +1,17 @@
-from typing import Any, Dict, Optional, Sequence
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
 
 import jwt
-from jwt.exceptions import InvalidIssuerError, InvalidTokenError
+from jwt.api_jws import _jws_global_obj
+from jwt.exceptions import (
+    ExpiredSignatureError,
+    InvalidAudienceError,
+    InvalidTokenError,
+    MissingRequiredClaimError,
+)
 
 from ..jwks import JWK, JWKS, KeysProvider
 from ..jwks.caching import CachingKeysProvider
@@ -23,6 +33,57 @@ class InvalidAccessToken(Exception):
         super().__init__(message)
 
 
+class _InvalidClaims(Exception):
+    """
+    Raised internally for access tokens whose signature was verified, but whose
+    claims are not valid: such access tokens are not valid whatever the keys.
+    """
+
+
+class _TokensCache:
+    """
+    Least recently used cache of values bound to access tokens, by token hash.
+    """
+
+    __slots__ = ("_cache_time", "_max_size", "_items")
+
+    def __init__(self, cache_time: float, max_size: int) -> None:
+        self._cache_time = cache_time
+        self._max_size = max_size
+        self._items: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def get_key(access_token: str) -> bytes:
+        # a digest is stored rather than the access token, to bound the memory used
+        return hashlib.blake2b(access_token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Any:
+        item = self._items.get(key)
+        if item is None:
+            return None
+
+        expiration_time, value = item
+        if time.time() >= expiration_time:
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: bytes, value: Any, exp: Any = None) -> None:
+        expiration_time = time.time() + self._cache_time
+
+        # exp is the expiration time of the access token, if known
+        if isinstance(exp, (int, float)) and exp < expiration_time:
+            expiration_time = exp
+
+        self._items[key] = (expiration_time, value)
+        self._items.move_to_end(key)
+
+        if len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+
 def get_kid(token: str) -> Optional[str]:
     """
     Extracts a kid (key id) from a JWT.
@@ -34,6 +95,18 @@ def get_kid(token: str) -> Optional[str]:
 
 
 class JWTValidator:
+    __slots__ = (
+        "_valid_issuers",
+        "_valid_audiences",
+        "_algorithms",
+        "_keys_provider",
+        "require_kid",
+        "max_token_length",
+        "logger",
+        "_tokens_cache",
+        "_rejected_tokens_cache",
+    )
+
     def __init__(
         self,
         *,
@@ -46,6 +119,11 @@ class JWTValidator:
         keys_url: Optional[str] = None,
         cache_time: float = 10800,
         refresh_time: float = 120,
+        tokens_cache_time: float = 0,
+        tokens_cache_size: int = 1000,
+        rejected_tokens_cache_time: float = 0,
+        rejected_tokens_cache_size: int = 1000,
+        max_token_length: int = 8192,
     ) -> None:
         """
         Creates a new instance of JWTValidator. This class only supports validating
@@ -61,7 +139,8 @@ class JWTValidator:
             If provided, keys are obtained from a standard well-known endpoint.
             This parameter is ignored if `keys_provider` is given.
         algorithms : Sequence[str], optional
-            Sequence of acceptable algorithms, by default ["RS256"].
+            Sequence of acceptable algorithms, by default ["RS256"]. ValueError is
+            raised for algorithms not registered with PyJWT.
         require_kid : bool, optional
             According to the specification, a key id is optional in JWK. However,
             this parameter lets control whether access tokens missing `kid` in their
@@ -82,6 +161,26 @@ class JWTValidator:
             JWKS are refreshed automatically if an unknown `kid` is encountered, and
             JWKS were last fetched more than `refresh_time` seconds ago (by default
             120 seconds)
+        tokens_cache_time : float
+            If greater than 0, the payloads of valid access tokens are cached in
+            memory for the given amount of seconds, or until the tokens expire, so
+            that access tokens received again are not validated again. By default 0
+            (disabled). Cached access tokens are accepted until their cache entry
+            expires, even if their signing key is removed from the JWKS meanwhile.
+        tokens_cache_size : int
+            Maximum number of access tokens whose payload is cached, by default 1000.
+        rejected_tokens_cache_time : float
+            If greater than 0, access tokens having a valid signature but invalid
+            claims (expired, or having an invalid audience or issuer) are remembered
+            for the given amount of seconds, so that access tokens received again are
+            rejected without being validated again. By default 0 (disabled). Access
+            tokens rejected for reasons that depend on the keys (e.g. a signature that
+            cannot be verified) or on time (nbf) are not remembered.
+        rejected_tokens_cache_size : int
+            Maximum number of rejected access tokens remembered, by default 1000.
+        max_token_length : int
+            Access tokens longer than the given number of characters are rejected
+            before being parsed, by default 8192.
         """
         if keys_provider:
             pass
@@ -96,14 +195,35 @@ class JWTValidator:
                 "`authority`, or `keys_provider`."
             )
 
+        # unsupported algorithms would otherwise make the validation of each access
+        # token fail, so they are reported when the validator is configured; the
+        # algorithms registered with PyJWT are the ones accepted by jwt.decode
+        unsupported = set(algorithms).difference(_jws_global_obj.get_algorithms())
+        if unsupported:
+            raise ValueError(
+                f"Unsupported algorithms: {', '.join(sorted(unsupported))}."
+            )
+
         keys_provider = CachingKeysProvider(keys_provider, cache_time, refresh_time)
 
-        self._valid_issuers = list(valid_issuers)
-        self._valid_audiences = list(valid_audiences)
+        self._valid_issuers = frozenset(valid_issuers)
+        self._valid_audiences = tuple(valid_audiences)
+        # a list, as annotated by PyJWT for jwt.decode
         self._algorithms = list(algorithms)
         self._keys_provider = keys_provider
         self.require_kid = require_kid
+        self.max_token_length = max_token_length
         self.logger = get_logger()
+        self._tokens_cache = (
+            _TokensCache(tokens_cache_time, tokens_cache_size)
+            if tokens_cache_time > 0
+            else None
+        )
+        self._rejected_tokens_cache = (
+            _TokensCache(rejected_tokens_cache_time, rejected_tokens_cache_size)
+            if rejected_tokens_cache_time > 0
+            else None
+        )
 
     async def get_jwks(self) -> JWKS:
         return await self._keys_provider.get_keys()
@@ -118,25 +238,34 @@ class JWTValidator:
     def _validate_jwt_by_key(
         self, access_token: str, jwk: JWK
     ) -> Optional[Dict[str, Any]]:
-        for issuer in self._valid_issuers:
-            try:
-                return jwt.decode(
-                    access_token,
-                    jwk.pem,  # type: ignore
-                    verify=True,
-                    algorithms=self._algorithms,
-                    audience=self._valid_audiences,
-                    issuer=issuer,
-                )
-            except InvalidIssuerError:
-                # pass, because the application might support more than one issuer;
-                # note that token verification might fail for several other reasons
-                # that are not catched (e.g. expired signature)
-                pass
-            except InvalidTokenError as exc:
-                self.logger.debug("Invalid access token: ", exc_info=exc)
-                return None
-        return None
+        try:
+            payload = jwt.decode(
+                access_token,
+                # a key object, so that PyJWT does not parse the PEM on each call
+                jwk.public_key,
+                verify=True,
+                algorithms=self._algorithms,
+                audience=self._valid_audiences,
+            )
+        except (
+            ExpiredSignatureError,
+            InvalidAudienceError,
+            MissingRequiredClaimError,
+        ) as exc:
+            # PyJWT validates these claims only once the signature is verified
+            self.logger.debug("Invalid access token: ", exc_info=exc)
+            raise _InvalidClaims() from exc
+        except InvalidTokenError as exc:
+            self.logger.debug("Invalid access token: ", exc_info=exc)
+            return None
+
+        # the issuer is validated here rather than by PyJWT, because only recent
+        # versions of PyJWT accept several issuers: this way a token is decoded once
+        # even when several issuers are valid, with any version of PyJWT
+        issuer = payload.get("iss")
+        if not isinstance(issuer, str) or issuer not in self._valid_issuers:
+            raise _InvalidClaims()
+        return payload
 
     async def validate_jwt(self, access_token: str) -> Dict[str, Any]:
         """
@@ -144,6 +273,47 @@ class JWTValidator:
         if the JWT is not valid (i.e. its signature cannot be verified, for example
         because the JWT expired).
         """
+        if len(access_token) > self.max_token_length:
+            # rejected before any decoding, hashing or signature verification
+            raise InvalidAccessToken("the access token is too long.")
+
+        tokens_cache = self._tokens_cache
+        rejected_tokens_cache = self._rejected_tokens_cache
+        key = b""
+
+        if tokens_cache is not None or rejected_tokens_cache is not None:
+            key = _TokensCache.get_key(access_token)
+
+            if tokens_cache is not None:
+                payload = tokens_cache.get(key)
+                if payload is not None:
+                    # a deep copy is returned, since callers might modify it,
+                    # including nested claims such as lists of roles
+                    return copy.deepcopy(payload)
+
+            if rejected_tokens_cache is not None and rejected_tokens_cache.get(key):
+                raise InvalidAccessToken()
+
+        try:
+            payload = await self._validate_jwt(access_token)
+        except _InvalidClaims:
+            if rejected_tokens_cache is not None:
+                rejected_tokens_cache.set(key, True)
+            raise InvalidAccessToken() from None
+
+        if payload is None:
+            raise InvalidAccessToken()
+
+        if tokens_cache is not None:
+            tokens_cache.set(key, copy.deepcopy(payload), payload.get("exp"))
+        return payload
+
+    async def _validate_jwt(self, access_token: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the payload of the given JWT, or None if its signature cannot be
+        verified with the available keys. Raises InvalidAccessToken if its kid is
+        missing or not recognized, and _InvalidClaims if its claims are not valid.
+        """
         kid = get_kid(access_token)
         if kid is None and self.require_kid:
             # A key id is optional according to the specification,
@@ -165,8 +335,6 @@ class JWTValidator:
             # Preferred scenario: the identity provider handles key ids,
             # thus we can validate an access token using an exact key
             jwk = await self.get_jwk(kid)
-            data = self._validate_jwt_by_key(access_token, jwk)
-            if data is not None:
-                return data
+            return self._validate_jwt_by_key(access_token, jwk)
 
-        raise InvalidAccessToken()
+        return None
@@ -1,18 +1,26 @@
 import asyncio
-import json
 import logging
 import sys
 import urllib.error
 import urllib.request
 
+try:
+    # faster parsing of JWKS and OpenID configurations, when available
+    from orjson import loads as json_loads  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads  # type: ignore
+
 
 def read_json_data(url: str):
     with urllib.request.urlopen(url) as response:
-        return json.loads(response.read())
+        return json_loads(response.read())
+
+
+_logger = logging.getLogger("auth-jwts")
 
 
 def get_logger():
-    return logging.getLogger("auth-jwts")
+    return _logger
 
 
 def get_running_loop():  # pragma: no cover
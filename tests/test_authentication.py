@@ -1,4 +1,5 @@
 from typing import Any, Optional
+from unittest.mock import AsyncMock
 from uuid import uuid4
 
 import pytest
@@ -35,6 +36,16 @@ def test_not_authenticated():
     assert a.is_authenticated() is False
 
 
+def test_authenticated_after_setting_authentication_mode():
+    a = Identity({"oid": "bc5f60df-4c27-49c1-8466-acf32618a6d2"})
+
+    a.authentication_mode = "Cookie"
+    assert a.is_authenticated()
+
+    a.authentication_mode = None
+    assert a.is_authenticated() is False
+
+
 def test_user_claims_shortcut():
     a = User(
         {"id": "001", "name": "Charlie Brown", "email": "charlie.brown@peanuts.eu"}
@@ -84,12 +95,58 @@ def test_has_claim_value():
     assert a.has_claim_value("hello", "World") is False
 
 
+def test_identity_slots():
+    for identity in (Identity(), User()):
+        assert not hasattr(identity, "__dict__")
+
+        with raises(AttributeError):
+            identity.foo = "foo"  # type: ignore
+
+
+def test_identity_subclass_can_define_attributes():
+    class CustomIdentity(Identity):
+        pass
+
+    identity = CustomIdentity({"sub": "001"}, "Cookie")
+    identity.foo = "foo"  # type: ignore
+
+    assert identity.sub == "001"
+    assert identity.foo == "foo"  # type: ignore
+
+
+def test_user_id_falls_back_to_sub():
+    assert User({"sub": "001"}).id == "001"
+    assert User({"id": "002", "sub": "001"}).id == "002"
+
+
 def test_claims_default():
     a = Identity()
 
     assert a.claims.get("oid") is None
 
 
+def test_claims_default_is_shared_and_read_only():
+    a = Identity()
+    b = User()
+
+    assert a.claims is b.claims
+    assert a.has_claim("oid") is False
+    assert a.sub is None
+
+    with raises(TypeError):
+        a.claims["oid"] = "001"  # type: ignore
+
+
+def test_given_claims_are_kept():
+    claims = {}
+    identity = Identity(claims)
+
+    assert identity.claims is claims
+
+    claims["oid"] = "001"
+    assert identity.has_claim("oid") is True
+
+
 @pytest.mark.asyncio
 async def test_authentication_strategy():
     class ExampleHandler(AuthenticationHandler):
@@ -173,6 +230,207 @@ async def test_authentication_strategy_by_scheme_throws_for_missing_scheme():
         await strategy.authenticate(Request({}), ["four"])
 
 
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_schemes():
+    strategy = get_strategy_with_schemes()
+
+    request = Request({})
+
+    await strategy.authenticate(request, ["four", "two", "one"])
+
+    # handlers are tried in the order in which they were registered
+    assert isinstance(request.user, User)
+    assert request.user["scope"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_schemes_keeps_registration_order():
+    class CustomSchemeHandler(AuthenticationHandler):
+        @property
+        def scheme(self) -> str:
+            return "custom"
+
+        def authenticate(self, context) -> Optional[Identity]:
+            return None
+
+    container = Container()
+    container.register(CustomSchemeHandler)
+
+    strategy = get_strategy_with_schemes()
+    strategy.container = container
+
+    result = await strategy.authenticate(Request({}), ["two", "one"])
+    assert result is not None and result["scope"] == "A"
+
+    # a handler type overriding scheme requires activating all handlers
+    strategy += CustomSchemeHandler
+
+    result = await strategy.authenticate(Request({}), ["two", "one"])
+    assert result is not None and result["scope"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_repeated_schemes():
+    calls = []
+
+    class CountingHandler(AuthenticationHandler):
+        def authenticate(self, context) -> Optional[Identity]:
+            calls.append(self)
+            return None
+
+    strategy = AuthenticationStrategy(CountingHandler())
+
+    result = await strategy.authenticate(
+        Request({}), ["CountingHandler", "CountingHandler"]
+    )
+
+    assert result is None
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_added_handler():
+    strategy = get_strategy_with_schemes()
+    strategy += InjectedAuthenticationHandler()
+
+    assert await strategy.authenticate(Request({}), ["three"]) is not None
+
+    result = await strategy.authenticate(Request({}), ["InjectedAuthenticationHandler"])
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_modified_handlers_list():
+    strategy = get_strategy_with_schemes()
+
+    result = await strategy.authenticate(Request({}), ["one"])
+    assert result is not None and result["scope"] == "A"
+
+    strategy.handlers.insert(0, TwoScheme(User({"id": "002", "scope": "D"})))
+
+    result = await strategy.authenticate(Request({}), ["one"])
+    assert result is not None and result["scope"] == "A"
+
+    result = await strategy.authenticate(Request({}), ["two"])
+    assert result is not None and result["scope"] == "D"
+
+    strategy.handlers = [ThreeScheme(User({"id": "003", "scope": "E"}))]
+
+    result = await strategy.authenticate(Request({}), ["three"])
+    assert result is not None and result["scope"] == "E"
+
+    with raises(AuthenticationSchemesNotFound, match="Configured schemes are: three"):
+        await strategy.authenticate(Request({}), ["one"])
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_di():
+    container = Container()
+
+    container.register(Foo)
+    container.register(InjectedAuthenticationHandler)
+
+    strategy = AuthenticationStrategy(
+        OneScheme(User({"id": "001", "scope": "A"})),
+        InjectedAuthenticationHandler,
+        container=container,
+    )
+
+    request = Request({})
+
+    await strategy.authenticate(request, ["InjectedAuthenticationHandler", "one"])
+
+    assert request.user["scope"] == "A"
+
+    with raises(
+        AuthenticationSchemesNotFound,
+        match="Configured schemes are: one, InjectedAuthenticationHandler",
+    ):
+        await strategy.authenticate(Request({}), ["four"])
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_di_activates_matching_types_only():
+    # no container is configured: handler types of other schemes must not be
+    # activated
+    strategy = AuthenticationStrategy(
+        InjectedAuthenticationHandler, OneScheme(User({"id": "001", "scope": "A"}))
+    )
+
+    request = Request({})
+
+    await strategy.authenticate(request, ["one"])
+
+    assert request.user["scope"] == "A"
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_di_custom_scheme():
+    class CustomSchemeHandler(AuthenticationHandler):
+        @property
+        def scheme(self) -> str:
+            return "custom"
+
+        def authenticate(self, context) -> Optional[Identity]:
+            return User({"id": "002"})
+
+    container = Container()
+    container.register(CustomSchemeHandler)
+
+    strategy = AuthenticationStrategy(
+        OneScheme(User({"id": "001"})), CustomSchemeHandler, container=container
+    )
+
+    result = await strategy.authenticate(Request({}), frozenset(["custom"]))
+
+    assert result is not None
+    assert result["id"] == "002"
+
+    with raises(
+        AuthenticationSchemesNotFound,
+        match="Configured schemes are: one, custom",
+    ):
+        await strategy.authenticate(Request({}), ["CustomSchemeHandler"])
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_by_scheme_di_resolved_to_other_scheme():
+    class BaseHandler(AuthenticationHandler):
+        def authenticate(self, context) -> Optional[Identity]:
+            return User({"id": "001"})
+
+    class DerivedHandler(BaseHandler):
+        def authenticate(self, context) -> Optional[Identity]:
+            return User({"id": "002"})
+
+    container = Container()
+    container.add_transient(BaseHandler, DerivedHandler)
+
+    strategy = AuthenticationStrategy(
+        OneScheme(User({"id": "003"})), BaseHandler, container=container
+    )
+
+    result = await strategy.authenticate(Request({}), ["DerivedHandler"])
+    assert result is not None and result["id"] == "002"
+
+    with raises(
+        AuthenticationSchemesNotFound,
+        match="Configured schemes are: one, DerivedHandler",
+    ):
+        await strategy.authenticate(Request({}), ["BaseHandler"])
+
+
+def test_authentication_schemes_not_found_error():
+    error = AuthenticationSchemesNotFound(["one", "two"], ["three"])
+
+    assert error.configured_schemes == ("one", "two")
+    assert error.required_schemes == ("three",)
+    assert str(error) == (
+        "Could not find authentication handlers for required schemes: three. "
+        "Configured schemes are: one, two"
+    )
+
+
 def test_default_authentication_scheme_name_matches_class_name():
     class Basic(AuthenticationHandler):
         async def authenticate(self, context: Any) -> Optional[Identity]:
@@ -182,8 +440,81 @@ def test_default_authentication_scheme_name_matches_class_name():
         async def authenticate(self, context: Any) -> Optional[Identity]:
             pass
 
+    class Derived(Basic):
+        pass
+
+    class CustomScheme(Basic):
+        @property
+        def scheme(self) -> str:
+            return "custom"
+
+    class DerivedCustomScheme(CustomScheme):
+        pass
+
     assert Basic().scheme == "Basic"
     assert Foo().scheme == "Foo"
+    assert Derived().scheme == "Derived"
+    assert CustomScheme().scheme == "custom"
+    assert DerivedCustomScheme().scheme == "custom"
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_duck_typed_and_patched_handlers():
+    class DuckTypedHandler:
+        scheme = "duck"
+
+        async def authenticate(self, context: Any) -> Optional[Identity]:
+            return User({"id": "001"})
+
+    class SyncHandler(AuthenticationHandler):
+        def authenticate(self, context: Any) -> Optional[Identity]:
+            return None
+
+    patched = SyncHandler()
+    patched.authenticate = AsyncMock(return_value=User({"id": "002"}))  # type: ignore
+
+    strategy = AuthenticationStrategy(DuckTypedHandler())  # type: ignore
+    result = await strategy.authenticate(Request({}))
+    assert result is not None and result["id"] == "001"
+
+    strategy = AuthenticationStrategy(patched)
+    result = await strategy.authenticate(Request({}))
+    assert result is not None and result["id"] == "002"
+
+
+def test_authentication_handler_is_async():
+    class SyncHandler(AuthenticationHandler):
+        def authenticate(self, context: Any) -> Optional[Identity]:
+            pass
+
+    class AsyncHandler(AuthenticationHandler):
+        async def authenticate(self, context: Any) -> Optional[Identity]:
+            pass
+
+    class DerivedHandler(AsyncHandler):
+        pass
+
+    assert SyncHandler._is_async is False
+    assert AsyncHandler._is_async is True
+    assert DerivedHandler._is_async is True
+
+
+@pytest.mark.asyncio
+async def test_authentication_strategy_sync_and_async_handlers():
+    class SyncHandler(AuthenticationHandler):
+        def authenticate(self, context: Any) -> Optional[Identity]:
+            return None
+
+    class AsyncHandler(AuthenticationHandler):
+        async def authenticate(self, context: Any) -> Optional[Identity]:
+            return Identity({"sub": "001"}, "Example")
+
+    strategy = AuthenticationStrategy(SyncHandler(), AsyncHandler())
+
+    identity = await strategy.authenticate(Request({}))
+
+    assert identity is not None
+    assert identity.sub == "001"
 
 
 class Foo:
@@ -210,6 +541,19 @@ async def test_authentication_di():
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_authentication_stops_at_first_identity():
+    # the second handler requires a DI container that is not configured: it must
+    # not be activated since the first handler already authenticates the context
+    auth = AuthenticationStrategy(
+        OneScheme(User({"id": "001"}, "one")), InjectedAuthenticationHandler
+    )
+
+    result = await auth.authenticate(Request({}))
+    assert result is not None
+    assert result.id == "001"
+
+
 @pytest.mark.asyncio
 async def test_authenticate_set_identity_context_attribute_error_handling():
     """
@@ -4,8 +4,10 @@ import pytest
 from pytest import raises
 from rodi import Container
 
+from guardpost import authorization
 from guardpost.authentication import Identity, User
 from guardpost.authorization import (
+    AuthorizationConfigurationError,
     AuthorizationContext,
     AuthorizationStrategy,
     ForbiddenError,
@@ -265,6 +267,41 @@ async def test_claims_requirement_sequence():
     assert context.has_succeeded is False
 
 
+def test_claims_requirement_set_required_claims():
+    requirement = ClaimsRequirement("name")
+    assert requirement.required_claims == ["name"]
+
+    requirement.required_claims = {"name": "Charlie"}
+    assert requirement.required_claims == {"name": "Charlie"}
+
+    context = AuthorizationContext(User({"name": "Charlie"}), [requirement])
+    requirement.handle(context)
+    assert context.has_succeeded
+
+    context = AuthorizationContext(User({"name": "Bob"}), [requirement])
+    requirement.handle(context)
+    assert context.has_succeeded is False
+
+
+def test_claims_requirement_uses_identity_methods():
+    class CaseInsensitiveUser(User):
+        def has_claim(self, name: str) -> bool:
+            return name.lower() in self.claims
+
+        def has_claim_value(self, name: str, value: str) -> bool:
+            return str(self.claims.get(name.lower())).lower() == value.lower()
+
+    identity = CaseInsensitiveUser({"name": "charlie"})
+
+    for requirement in (
+        ClaimsRequirement("NAME"),
+        ClaimsRequirement({"NAME": "Charlie"}),
+    ):
+        context = AuthorizationContext(identity, [requirement])
+        requirement.handle(context)
+        assert context.has_succeeded
+
+
 @pytest.mark.asyncio
 async def test_auth_without_policy_no_identity():
     auth: AuthorizationStrategy = get_strategy([])
@@ -386,6 +423,86 @@ async def test_authorization_di_scoped():
     assert await auth.authorize("example", identity) is None
 
 
+@pytest.mark.asyncio
+async def test_auth_decorator_calls_authorize():
+    calls = []
+
+    class CustomStrategy(AuthorizationStrategy):
+        async def authorize(self, policy_name, identity, scope=None):
+            calls.append(policy_name)
+            await super().authorize(policy_name, identity, scope)
+
+    auth = CustomStrategy(
+        Policy("example", NoopRequirement()), identity_getter=empty_identity_getter
+    )
+
+    @auth(policy="example")
+    async def some_method():
+        return True
+
+    assert await some_method() is True
+    assert calls == ["example"]
+
+
+class AsyncBaseRequirement(Requirement):
+    """Inherits the asynchronous handle method of Requirement."""
+
+
+class SyncImplementation(AsyncBaseRequirement):
+    def handle(self, context):
+        context.succeed(self)
+
+
+class SyncBaseRequirement(Requirement):
+    def handle(self, context):
+        pass
+
+
+class AsyncImplementation(SyncBaseRequirement):
+    async def handle(self, context):
+        context.succeed(self)
+
+
+@pytest.mark.asyncio
+async def test_authorization_di_requirements_are_classified_once_resolved():
+    container = Container()
+
+    container.add_transient(AsyncBaseRequirement, SyncImplementation)
+    container.add_transient(SyncBaseRequirement, AsyncImplementation)
+
+    auth = AuthorizationStrategy(
+        Policy("one", AsyncBaseRequirement),
+        Policy("two", SyncBaseRequirement),
+        container=container,
+    )
+
+    assert await auth.authorize("one", Identity()) is None
+    assert await auth.authorize("two", Identity()) is None
+    assert auth.authorize_sync("one", Identity()) is None
+
+    with raises(AuthorizationConfigurationError, match="asynchronous requirements"):
+        auth.authorize_sync("two", Identity())
+
+
+@pytest.mark.asyncio
+async def test_policy_requirements_can_be_replaced():
+    class AsyncRequirement(Requirement):
+        async def handle(self, context: AuthorizationContext):
+            context.succeed(self)
+
+    policy = Policy("example", NoopRequirement())
+    requirement = AsyncRequirement()
+    policy.requirements = [requirement]  # type: ignore
+
+    assert policy.requirements == (requirement,)
+
+    auth = AuthorizationStrategy(policy)
+    assert await auth.authorize("example", Identity()) is None
+
+    with raises(AuthorizationConfigurationError, match="asynchronous requirements"):
+        auth.authorize_sync("example", Identity())
+
+
 @pytest.mark.asyncio
 async def test_auth_raises_for_missing_identity_getter():
     auth: AuthorizationStrategy = get_strategy([])
@@ -444,3 +561,174 @@ async def test_authorization_identity_getter_forbidden():
 
     with pytest.raises(ForbiddenError):
         await some_method(Request(User({"name": "Foo"}, authentication_mode="cookie")))
+
+
+@pytest.mark.asyncio
+async def test_policy_with_sync_and_async_requirements():
+    calls = []
+
+    class SyncRequirement(Requirement):
+        def handle(self, context: AuthorizationContext):
+            calls.append(self)
+            context.succeed(self)
+
+    class AsyncRequirement(Requirement):
+        async def handle(self, context: AuthorizationContext):
+            calls.append(self)
+            context.succeed(self)
+
+    one, two, three = SyncRequirement(), AsyncRequirement(), SyncRequirement()
+    policy = Policy("mixed", one, two)
+    policy += three
+
+    auth = AuthorizationStrategy(policy)
+
+    assert await auth.authorize("mixed", Identity()) is None
+    assert calls == [one, two, three]
+
+
+@pytest.mark.asyncio
+async def test_policy_requirement_instances_are_not_classified_per_call(
+    monkeypatch,
+):
+    classified = []
+
+    def is_async_handler(requirement_type):
+        classified.append(requirement_type)
+        return False
+
+    container = Container()
+    container.register(NoopRequirement)
+
+    auth = AuthorizationStrategy(
+        Policy("instances", NoopRequirement(), AuthenticatedRequirement()),
+        Policy("types", NoopRequirement),
+        container=container,
+    )
+    monkeypatch.setattr(authorization, "_is_async_handler", is_async_handler)
+
+    assert await auth.authorize("instances", Identity({}, "Cookie")) is None
+    assert classified == []
+
+    assert await auth.authorize("types", Identity()) is None
+    assert classified == [NoopRequirement]
+
+
+def test_authorize_sync():
+    auth = AuthorizationStrategy(
+        Policy("authenticated", AuthenticatedRequirement()),
+        Policy("noop", NoopRequirement()),
+    )
+
+    assert auth.authorize_sync("noop", Identity()) is None
+    assert auth.authorize_sync("authenticated", Identity({}, "Cookie")) is None
+    assert auth.authorize_sync(None, Identity({}, "Cookie")) is None
+
+    with raises(UnauthorizedError):
+        auth.authorize_sync("authenticated", Identity())
+
+    with raises(UnauthorizedError, match="The resource requires authentication"):
+        auth.authorize_sync(None, Identity())
+
+    with raises(PolicyNotFoundError):
+        auth.authorize_sync("admin", Identity())
+
+
+def test_authorize_sync_raises_for_async_requirements():
+    class Example(Requirement):
+        async def handle(self, context: AuthorizationContext):
+            context.succeed(self)
+
+    auth = AuthorizationStrategy(Policy("example", Example()))
+
+    with raises(AuthorizationConfigurationError, match="asynchronous requirements"):
+        auth.authorize_sync("example", Identity())
+
+
+@pytest.mark.asyncio
+async def test_auth_decorator_applies_sync_policies_synchronously():
+    class Example(Requirement):
+        async def handle(self, context: AuthorizationContext):
+            context.succeed(self)
+
+    calls = []
+
+    class CustomStrategy(AuthorizationStrategy):
+        def _handle_with_sync_policy(self, policy, identity, scope):
+            calls.append(("sync", policy.name))
+            super()._handle_with_sync_policy(policy, identity, scope)
+
+        async def _handle_with_policy(self, policy, identity, scope):
+            calls.append(("async", policy.name))
+            await super()._handle_with_policy(policy, identity, scope)
+
+    container = Container()
+    container.register(NoopRequirement)
+
+    auth = CustomStrategy(
+        Policy("sync", NoopRequirement(), AuthenticatedRequirement()),
+        Policy("async", NoopRequirement(), Example()),
+        Policy("types", NoopRequirement),
+        container=container,
+        identity_getter=lambda: Identity({}, "Cookie"),
+    )
+
+    for name in ("sync", "async", "types"):
+
+        @auth(policy=name)
+        async def some_method():
+            return True
+
+        assert await some_method() is True
+
+    assert calls == [("sync", "sync"), ("async", "async"), ("async", "types")]
+
+    auth.identity_getter = empty_identity_getter
+
+    @auth(policy="sync")
+    async def other_method():
+        return True
+
+    with raises(UnauthorizedError):
+        await other_method()
+
+
+def test_policy_requirements_tuple():
+    one, two = NoopRequirement(), NoopRequirement()
+    policy = Policy("example", one)
+    policy.add(two)
+
+    assert policy.requirements == (one, two)
+
+
+def test_policy_add_ignores_requirements_already_included():
+    one, two = NoopRequirement(), NoopRequirement()
+    policy = Policy("example", one)
+
+    policy.add(two).add(one)
+    policy += two
+
+    assert policy.requirements == (one, two)
+
+    assert Policy("example", one, two, one).requirements == (one, two)
+
+    policy.requirements = [two, two, one]  # type: ignore
+    assert policy.requirements == (two, one)
+
+
+def test_authorization_context_pending_requirements():
+    one, two, three = NoopRequirement(), NoopRequirement(), NoopRequirement()
+
+    with AuthorizationContext(Identity(), [one, two, three]) as context:
+        assert context.pending_requirements == [one, two, three]
+
+        context.succeed(two)
+        assert context.pending_requirements == [one, three]
+        assert context.has_succeeded is False
+
+        context.succeed(one)
+        context.succeed(three)
+        assert context.pending_requirements == []
+        assert context.has_succeeded is True
+
+    assert context.pending_requirements == [one, two, three]
@@ -11,7 +11,11 @@ from guardpost.authentication import (
     Identity,
 )
 from guardpost.authorization import AuthorizationStrategy, Policy, UnauthorizedError
-from guardpost.common import AnonymousPolicy, AuthenticatedRequirement
+from guardpost.common import (
+    AnonymousPolicy,
+    AnonymousRequirement,
+    AuthenticatedRequirement,
+)
 
 
 @pytest.mark.asyncio
@@ -34,6 +38,15 @@ async def test_anonymous_policy():
     assert True
 
 
+def test_anonymous_policies_share_requirement():
+    one = AnonymousPolicy()
+    two = AnonymousPolicy("other")
+
+    assert len(one.requirements) == 1
+    assert isinstance(one.requirements[0], AnonymousRequirement)
+    assert one.requirements[0] is two.requirements[0]
+
+
 def test_policy_iadd_syntax():
     strategy = AuthorizationStrategy(default_policy=Policy("default"))
 
@@ -137,6 +150,47 @@ def test_authorization_strategy_iadd_method():
     assert strategy.policies[1] is two
 
 
+def test_authorization_strategy_get_policy():
+    one = Policy("one")
+    two = Policy("two")
+    strategy = AuthorizationStrategy(one)
+
+    assert strategy.get_policy("one") is one
+    assert strategy.get_policy("two") is None
+
+    strategy.add(two)
+
+    assert strategy.get_policy("two") is two
+    assert strategy.get_policy("three") is None
+
+
+def test_authorization_strategy_get_policy_returns_first_match():
+    one = Policy("example")
+    two = Policy("example")
+    strategy = AuthorizationStrategy(one)
+
+    strategy += two
+
+    assert strategy.get_policy("example") is one
+
+
+def test_authorization_strategy_get_policy_appended_to_policies():
+    one = Policy("one")
+    two = Policy("two")
+    strategy = AuthorizationStrategy(one)
+
+    assert strategy.get_policy("two") is None
+
+    strategy.policies.append(two)
+
+    assert strategy.get_policy("two") is two
+    assert strategy.get_policy("two") is two
+
+    strategy.policies = [Policy("three")]
+
+    assert strategy.get_policy("three") is strategy.policies[0]
+
+
 def test_authorization_strategy_set_default_fluent():
     strategy = AuthorizationStrategy()
 
@@ -174,3 +228,20 @@ def test_container_getter_raises_for_missing_container():
 
 def test_import_version():
     from guardpost.__about__ import __version__  # noqa
+
+
+def test_package_exports():
+    import guardpost
+
+    assert guardpost.Identity is Identity
+    assert guardpost.Policy is Policy
+
+    for name in guardpost.__all__:
+        assert getattr(guardpost, name) is not None
+
+    with raises(AttributeError):
+        guardpost.Foo  # type: ignore
+
+    names = dir(guardpost)
+    assert len(names) == len(set(names))
+    assert set(guardpost.__all__) <= set(names)
@@ -1,7 +1,8 @@
 import pytest
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 
 from guardpost.errors import UnsupportedFeatureError
-from guardpost.jwks import JWK, JWKS, KeyType
+from guardpost.jwks import JWK, JWKS, KeyType, rsa_pem_from_n_and_e
 
 
 def test_keytype_from_str():
@@ -9,6 +10,9 @@ def test_keytype_from_str():
     assert KeyType.from_str("oct") is KeyType.OCT
     assert KeyType.from_str("RSA") is KeyType.RSA
     assert KeyType.from_str("OKP") is KeyType.OKP
+    assert KeyType.from_str("OCT") is KeyType.OCT
+    assert KeyType.from_str("rsa") is KeyType.RSA
+    assert KeyType.from_str("Ec") is KeyType.EC
 
     with pytest.raises(ValueError):
         KeyType.from_str("xx")
@@ -30,6 +34,33 @@ def test_jwk_raises_for_unsupported_type():
         JWK.from_dict({"kty": "RSA"})
 
 
+def test_rsa_pem_from_n_and_e_is_cached():
+    n = "xzO7x0gEMbktuu5RLUqiABJNqt4kdm_5ucsKgSdHUdUcbkG28dLAikoFTki9awmyapSbO84zlKMaH24obOe44hd32sdeMOlqHtMGHCKv3yf1sXtMMqXuNnk6h_ic0-kYHIEJrlBm9aGg0FS6wu0wR1ybD3VpNeKr7fUYbxNwmz3jOGmhnX_r9sdLQLAPPT9ex47khBKGETVnSMEWN6q4-pUPhV07XZNhp6lwJ9o4TINDzzEPTJKcNNjgUwhIzTIhbbVBBMXMA_dGKKHd5XZvj1yVr0ePD4wi6H1wBG1DLydHBgeHVA8prVaCwuGEjq9EiekFTO-OJeUWsDZVS9ByKmpE-WAp-2hOrQ"
+    e = "AQAB"
+
+    pem = rsa_pem_from_n_and_e(n, e)
+
+    assert pem.startswith(b"-----BEGIN PUBLIC KEY-----")
+    assert rsa_pem_from_n_and_e(n, e) is pem
+    assert JWK.from_dict({"kty": "RSA", "n": n, "e": e}).pem is pem
+
+
+def test_jwk_public_key_is_loaded_once():
+    jwk = JWK.from_dict(
+        {
+            "kty": "RSA",
+            "n": "xzO7x0gEMbktuu5RLUqiABJNqt4kdm_5ucsKgSdHUdUcbkG28dLAikoFTki9awmyapSbO84zlKMaH24obOe44hd32sdeMOlqHtMGHCKv3yf1sXtMMqXuNnk6h_ic0-kYHIEJrlBm9aGg0FS6wu0wR1ybD3VpNeKr7fUYbxNwmz3jOGmhnX_r9sdLQLAPPT9ex47khBKGETVnSMEWN6q4-pUPhV07XZNhp6lwJ9o4TINDzzEPTJKcNNjgUwhIzTIhbbVBBMXMA_dGKKHd5XZvj1yVr0ePD4wi6H1wBG1DLydHBgeHVA8prVaCwuGEjq9EiekFTO-OJeUWsDZVS9ByKmpE-WAp-2hOrQ",
+            "e": "AQAB",
+        }
+    )
+
+    public_key = jwk.public_key
+
+    assert isinstance(public_key, RSAPublicKey)
+    assert public_key.public_numbers().e == 65537
+    assert jwk.public_key is public_key
+
+
 def test_jwks_update():
     jwks_1 = JWKS.from_dict(
         {
@@ -1,17 +1,22 @@
+import asyncio
+import json
 import time
+from types import SimpleNamespace
 from typing import Any, Dict, Iterable
 
 import jwt
 import pytest
+from jwt.algorithms import RSAAlgorithm
 
-from guardpost.jwks import JWKS, InMemoryKeysProvider, KeysProvider
+from guardpost import jwts
+from guardpost.jwks import JWKS, InMemoryKeysProvider, KeysProvider, caching, openid
 from guardpost.jwks.caching import CachingKeysProvider
 from guardpost.jwks.openid import AuthorityKeysProvider
 from guardpost.jwks.urls import URLKeysProvider
 from guardpost.jwts import InvalidAccessToken, JWTValidator
 
 from .serverfixtures import *  # noqa
-from .serverfixtures import BASE_URL, get_file_path, get_test_jwks
+from .serverfixtures import BASE_URL, get_file_path, get_test_jwks, get_test_jwks_dict
 
 
 @pytest.fixture(scope="session")
@@ -233,6 +238,71 @@ async def test_jwt_validator_raises_for_invalid_audience(default_keys_provider):
         await validator.validate_jwt(valid_token)
 
 
+@pytest.mark.asyncio
+async def test_jwt_validator_rejects_too_long_access_tokens(default_keys_provider):
+    payload = {"aud": "a", "iss": "b", "data": "x" * 200}
+    access_token = get_access_token("0", payload)
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+        max_token_length=len(access_token),
+    )
+
+    assert await validator.validate_jwt(access_token) == payload
+
+    validator.max_token_length = len(access_token) - 1
+
+    with pytest.raises(InvalidAccessToken, match="too long"):
+        await validator.validate_jwt(access_token)
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_default_max_token_length(default_keys_provider):
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+    )
+
+    assert validator.max_token_length == 8192
+
+    with pytest.raises(InvalidAccessToken, match="too long"):
+        await validator.validate_jwt("x" * 8193)
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_supports_several_issuers(default_keys_provider):
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b", "c"],
+        keys_provider=default_keys_provider,
+    )
+
+    for issuer in ("b", "c"):
+        payload = {"aud": "a", "iss": issuer}
+        assert await validator.validate_jwt(get_access_token("0", payload)) == payload
+
+    for payload in ({"aud": "a", "iss": "d"}, {"aud": "a"}):
+        with pytest.raises(InvalidAccessToken):
+            await validator.validate_jwt(get_access_token("0", payload))
+
+    # jwt.encode refuses a non-string iss in recent versions of PyJWT, so this
+    # token is signed through PyJWS
+    with open(get_file_path("0.pem"), "r") as key_file:
+        private_key = key_file.read()
+
+    access_token = jwt.PyJWS().encode(
+        json.dumps({"aud": "a", "iss": ["b"]}).encode(),
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "0"},
+    )
+
+    with pytest.raises(InvalidAccessToken):
+        await validator.validate_jwt(access_token)
+
+
 def test_authority_keys_provider_raises_for_missing_parameter():
     with pytest.raises(TypeError):
         AuthorityKeysProvider(None)  # type: ignore
@@ -241,6 +311,40 @@ def test_authority_keys_provider_raises_for_missing_parameter():
         AuthorityKeysProvider("")
 
 
+def test_jwt_validator_raises_for_unsupported_algorithms(default_keys_provider):
+    with pytest.raises(ValueError, match="Unsupported algorithms: RS257"):
+        JWTValidator(
+            valid_audiences=["a"],
+            valid_issuers=["b"],
+            keys_provider=default_keys_provider,
+            algorithms=["RS256", "RS257"],
+        )
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_accepts_registered_algorithms(default_keys_provider):
+    payload = {"aud": "a", "iss": "b"}
+
+    with open(get_file_path("0.pem"), "r") as key_file:
+        private_key = key_file.read()
+
+    jwt.register_algorithm("RS256-TEST", RSAAlgorithm(RSAAlgorithm.SHA256))
+    try:
+        validator = JWTValidator(
+            valid_audiences=["a"],
+            valid_issuers=["b"],
+            keys_provider=default_keys_provider,
+            algorithms=["RS256-TEST"],
+        )
+        access_token = jwt.encode(
+            payload, private_key, algorithm="RS256-TEST", headers={"kid": "0"}
+        )
+
+        assert await validator.validate_jwt(access_token) == payload
+    finally:
+        jwt.unregister_algorithm("RS256-TEST")
+
+
 def test_url_keys_provider_raises_for_missing_parameter():
     with pytest.raises(TypeError):
         URLKeysProvider(None)  # type: ignore
@@ -252,3 +356,299 @@ def test_url_keys_provider_raises_for_missing_parameter():
 def test_caching_keys_provider_raises_for_missing_parameter():
     with pytest.raises(TypeError):
         CachingKeysProvider(None, 1)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_caching_keys_provider_get_key():
+    keys = get_test_jwks()
+    keys_provider = CachingKeysProvider(
+        MockedKeysProvider(
+            [JWKS(keys.keys[0:2]), JWKS([keys.keys[2], keys.keys[0], keys.keys[3]])]
+        ),
+        cache_time=10,
+        refresh_time=0.1,
+    )
+
+    assert await keys_provider.get_key("0") is keys.keys[0]
+    assert await keys_provider.get_key("1") is keys.keys[1]
+    assert await keys_provider.get_key("2") is None
+
+    time.sleep(0.2)
+
+    assert await keys_provider.get_key("2") is keys.keys[2]
+    assert await keys_provider.get_key("3") is keys.keys[3]
+    assert await keys_provider.get_key("0") is keys.keys[0]
+    # keys known before the refresh are kept
+    assert await keys_provider.get_key("1") is keys.keys[1]
+
+
+@pytest.mark.asyncio
+async def test_caching_keys_provider_fetches_keys_once_for_concurrent_calls():
+    keys = get_test_jwks()
+    calls = 0
+
+    class SlowKeysProvider(KeysProvider):
+        async def get_keys(self) -> JWKS:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return keys
+
+    keys_provider = CachingKeysProvider(SlowKeysProvider(), cache_time=10)
+
+    results = await asyncio.gather(*[keys_provider.get_keys() for _ in range(5)])
+
+    assert calls == 1
+    assert all(result is keys for result in results)
+
+    assert await keys_provider.get_keys() is keys
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_caching_keys_provider_fetches_keys_again_after_failure():
+    keys = get_test_jwks()
+
+    class FailingKeysProvider(KeysProvider):
+        def __init__(self) -> None:
+            self.failed = False
+
+        async def get_keys(self) -> JWKS:
+            if not self.failed:
+                self.failed = True
+                raise RuntimeError("Crash test")
+            return keys
+
+    keys_provider = CachingKeysProvider(FailingKeysProvider(), cache_time=10)
+
+    with pytest.raises(RuntimeError):
+        await keys_provider.get_keys()
+
+    assert await keys_provider.get_keys() is keys
+
+
+@pytest.mark.asyncio
+async def test_authority_keys_provider_reuses_jwks_uri(monkeypatch):
+    jwks_dict = get_test_jwks_dict()
+    requested_urls = []
+
+    def read_json_data(url: str):
+        requested_urls.append(url)
+        if url.endswith("/.well-known/openid-configuration"):
+            return {"jwks_uri": f"{BASE_URL}/jwks.json"}
+        return jwks_dict
+
+    monkeypatch.setattr(openid, "read_json_data", read_json_data)
+
+    keys_provider = AuthorityKeysProvider(BASE_URL)
+
+    for _ in range(3):
+        jwks = await keys_provider.get_keys()
+        assert len(jwks.keys) == len(jwks_dict["keys"])
+
+    assert requested_urls == [
+        f"{BASE_URL}/.well-known/openid-configuration",
+        f"{BASE_URL}/jwks.json",
+        f"{BASE_URL}/jwks.json",
+        f"{BASE_URL}/jwks.json",
+    ]
+
+
+class UnavailableKeysProvider(KeysProvider):
+    async def get_keys(self) -> JWKS:
+        raise RuntimeError("Keys must not be fetched")
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_tokens_cache(default_keys_provider):
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+        tokens_cache_time=10,
+    )
+
+    payload = {
+        "aud": "a",
+        "iss": "b",
+        "exp": int(time.time()) + 10,
+        "roles": ["reader"],
+    }
+    valid_token = get_access_token("0", payload)
+
+    value = await validator.validate_jwt(valid_token)
+    assert value == payload
+    value["roles"].append("admin")
+
+    # payloads of cached tokens are returned without fetching keys again
+    validator._keys_provider = CachingKeysProvider(UnavailableKeysProvider(), 10)
+
+    value = await validator.validate_jwt(valid_token)
+    assert value == payload
+
+    # callers get copies, so modifying claims does not affect later calls
+    value["aud"] = "modified"
+    value["roles"].append("admin")
+    value = await validator.validate_jwt(valid_token)
+    assert value == payload
+
+    with pytest.raises(RuntimeError):
+        await validator.validate_jwt(get_access_token("1", payload))
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_tokens_cache_respects_expiration(
+    default_keys_provider, monkeypatch
+):
+    now = time.time()
+    monkeypatch.setattr(jwts, "time", SimpleNamespace(time=lambda: now))
+
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+        tokens_cache_time=10,
+    )
+
+    payload = {"aud": "a", "iss": "b", "exp": int(now) + 5}
+    valid_token = get_access_token("0", payload)
+
+    assert await validator.validate_jwt(valid_token) == payload
+
+    validator._keys_provider = CachingKeysProvider(UnavailableKeysProvider(), 10)
+
+    now = payload["exp"] - 1
+    assert await validator.validate_jwt(valid_token) == payload
+
+    # the cache entry expires with the access token, which is then validated again
+    now = payload["exp"]
+    with pytest.raises(RuntimeError):
+        await validator.validate_jwt(valid_token)
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_rejected_tokens_cache(default_keys_provider):
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+        rejected_tokens_cache_time=10,
+    )
+
+    invalid_claims_tokens = [
+        get_access_token("0", {"aud": "a", "iss": "c"}),
+        get_access_token("0", {"aud": "c", "iss": "b"}),
+        get_access_token("0", {"aud": "a", "iss": "b", "exp": int(time.time()) - 10}),
+    ]
+    # rejections that depend on the keys
+    other_tokens = [
+        get_access_token("0", {"aud": "a", "iss": "b"}, fake_kid="x"),
+        get_access_token("1", {"aud": "a", "iss": "b"}, fake_kid="0"),
+    ]
+
+    for access_token in invalid_claims_tokens + other_tokens:
+        with pytest.raises(InvalidAccessToken):
+            await validator.validate_jwt(access_token)
+
+    validator._keys_provider = CachingKeysProvider(UnavailableKeysProvider(), 10)
+
+    # access tokens having invalid claims are rejected again without fetching keys
+    for access_token in invalid_claims_tokens:
+        with pytest.raises(InvalidAccessToken):
+            await validator.validate_jwt(access_token)
+
+    # other access tokens are not remembered, since keys can change
+    for access_token in other_tokens:
+        with pytest.raises(RuntimeError):
+            await validator.validate_jwt(access_token)
+
+
+@pytest.mark.asyncio
+async def test_jwt_validator_tokens_cache_size(default_keys_provider):
+    validator = JWTValidator(
+        valid_audiences=["a"],
+        valid_issuers=["b"],
+        keys_provider=default_keys_provider,
+        tokens_cache_time=10,
+        tokens_cache_size=1,
+    )
+
+    payload = {"aud": "a", "iss": "b"}
+    token_0 = get_access_token("0", payload)
+    token_1 = get_access_token("1", payload)
+
+    await validator.validate_jwt(token_0)
+    await validator.validate_jwt(token_1)
+
+    validator._keys_provider = CachingKeysProvider(UnavailableKeysProvider(), 10)
+
+    assert await validator.validate_jwt(token_1) == payload
+
+    # the least recently used token was evicted
+    with pytest.raises(RuntimeError):
+        await validator.validate_jwt(token_0)
+
+
+@pytest.mark.asyncio
+async def test_caching_keys_provider_fetches_keys_in_background_before_expiration(
+    monkeypatch,
+):
+    now = 1000.0
+    monkeypatch.setattr(caching, "time", SimpleNamespace(monotonic=lambda: now))
+
+    keys = get_test_jwks()
+    jwks_1, jwks_2 = JWKS(keys.keys[0:2]), JWKS(keys.keys[2:])
+    keys_provider = CachingKeysProvider(
+        MockedKeysProvider([jwks_1, jwks_2]), cache_time=10
+    )
+
+    assert await keys_provider.get_keys() is jwks_1
+
+    now += 9.5
+
+    # keys about to expire are returned, while new keys are fetched in background
+    assert await keys_provider.get_keys() is jwks_1
+    await asyncio.sleep(0)
+
+    assert await keys_provider.get_keys() is jwks_2
+
+
+@pytest.mark.asyncio
+async def test_caching_keys_provider_waits_before_retrying_failed_background_fetch(
+    monkeypatch,
+):
+    now = 1000.0
+    monkeypatch.setattr(caching, "time", SimpleNamespace(monotonic=lambda: now))
+
+    keys = get_test_jwks()
+    calls = 0
+
+    class FailingKeysProvider(KeysProvider):
+        async def get_keys(self) -> JWKS:
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise RuntimeError("Crash test")
+            return keys
+
+    keys_provider = CachingKeysProvider(
+        FailingKeysProvider(), cache_time=300, refresh_time=10
+    )
+
+    assert await keys_provider.get_keys() is keys
+
+    now += 280
+
+    # the background fetch fails: keys are not fetched again on each call
+    for _ in range(3):
+        assert await keys_provider.get_keys() is keys
+        await asyncio.sleep(0)
+
+    assert calls == 2
+
+    now += 10
+
+    assert await keys_provider.get_keys() is keys
+    await asyncio.sleep(0)
+
+    assert calls == 3